@@ -5,16 +5,25 @@ Generate optimized mappings.json from XBRL taxonomy XML files.
 This script reads:
 - mapping.xml: XBRL metadata (name, type, prefix, period_type)
 - dimension.xml: UI metadata (labels, hierarchy levels)
+- report.xml: report names (for the search index)
 
-And generates a clean, optimized JSON structure.
+And generates a clean, optimized JSON structure, plus rollups.json with the
+subtotal dependency graph of each report (see build_rollups) and
+search-index.json (see search_index.py).
 """
 
 import xml.etree.ElementTree as ET
 import json
+import re
+import sys
+import argparse
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+import tracing
+from search_index import build_search_index, parse_report_names
+
 
 def parse_mapping_xml(xml_path):
     """
@@ -24,7 +33,8 @@ def parse_mapping_xml(xml_path):
         dict: {code: {name, type, prefix, period_type, def_code}}
     """
     print(f"Parsing {xml_path}...")
-    tree = ET.parse(xml_path)
+    with tracing.span('parse XML', file=Path(xml_path).name):
+        tree = ET.parse(xml_path)
     root = tree.getroot()
 
     mappings = {}
@@ -35,27 +45,30 @@ def parse_mapping_xml(xml_path):
         if not report_code:
             continue
 
-        # Find all <cell> elements within this report
-        for cell in report.findall('.//cell'):
-            code = cell.get('code')
-            if not code:
-                continue
-
-            # Extract XBRL attributes
-            xbrl_name = cell.get('{http://www.xbrl.org}name')
-            xbrl_type = cell.get('{http://www.xbrl.org}type')
-            xbrl_prefix = cell.get('{http://www.xbrl.org}prefix')
-            xbrl_period_type = cell.get('{http://www.xbrl.org}periodType')
-            def_code = cell.get('def_code')
-
-            mappings[code] = {
-                'name': xbrl_name,
-                'type': xbrl_type,
-                'prefix': xbrl_prefix,
-                'period_type': xbrl_period_type,
-                'def_code': def_code,
-                'report': report_code
-            }
+        with tracing.span('traverse mapping.xml report', report=report_code):
+            # Find all <cell> elements within this report
+            cells = report.findall('.//cell')
+            for cell in cells:
+                code = cell.get('code')
+                if not code:
+                    continue
+
+                # Extract XBRL attributes
+                xbrl_name = cell.get('{http://www.xbrl.org}name')
+                xbrl_type = cell.get('{http://www.xbrl.org}type')
+                xbrl_prefix = cell.get('{http://www.xbrl.org}prefix')
+                xbrl_period_type = cell.get('{http://www.xbrl.org}periodType')
+                def_code = cell.get('def_code')
+
+                mappings[code] = {
+                    'name': xbrl_name,
+                    'type': xbrl_type,
+                    'prefix': xbrl_prefix,
+                    'period_type': xbrl_period_type,
+                    'def_code': def_code,
+                    'report': report_code
+                }
+            tracing.count('cells_seen', len(cells))
 
     print(f"  Found {len(mappings)} XBRL mappings")
     return mappings
@@ -66,10 +79,12 @@ def parse_dimension_xml(xml_path):
     Parse dimension.xml to extract UI metadata (labels, indent levels).
 
     Returns:
-        dict: {code: {label, indent_level, type, order}}
+        tuple: ({code: {label, indent_level, type, order}}, parsed root
+                element, reused by build_rollups)
     """
     print(f"Parsing {xml_path}...")
-    tree = ET.parse(xml_path)
+    with tracing.span('parse XML', file=Path(xml_path).name):
+        tree = ET.parse(xml_path)
     root = tree.getroot()
 
     dimensions = {}
@@ -108,12 +123,200 @@ def parse_dimension_xml(xml_path):
         if not report_code:
             continue
 
-        # Find all <dimension> elements
-        for dimension in report.findall('.//dimension'):
-            traverse_children(dimension, report_code)
+        with tracing.span('traverse dimension.xml report', report=report_code):
+            # Find all <dimension> elements
+            for dimension in report.findall('.//dimension'):
+                traverse_children(dimension, report_code)
 
     print(f"  Found {len(dimensions)} dimension entries")
-    return dimensions
+    return dimensions, root
+
+
+# XBRL types that can never be summed into a subtotal
+NON_NUMERIC_TYPES = ('abstract', 'string', 'nonnum:textBlock', 'date', 'boolean', 'tuple')
+
+# "Di cui ..." rows break down a sibling ("of which") and are never summed
+BREAKDOWN_PREFIX = 'di cui'
+
+# Movement kinds (first word of the label) that reduce the balance
+# in a "Totale variazioni" group
+DECREASE_MOVEMENTS = ('decrementi', 'ammortamento', 'svalutazioni', 'utilizzo')
+
+# "Totale proventi e oneri finanziari (15 + 16 - 17 + - 17-bis)" → signed terms
+FORMULA_TERM_RE = re.compile(r'([+-][\s+-]*)?(\d+(?:-[a-z]+)?|[A-Z])(?=[\s)]|$)')
+# "17-bis) utili e perdite su cambi" → "17-bis", "B) Costi della produzione" → "B"
+CHILD_NUMBER_RE = re.compile(r'^(\d+(?:-[a-z]+)?|[A-Z])\)')
+# "Debiti non assistiti da ..." → "debiti assistiti da ..."
+NEGATION_RE = re.compile(r'\bnon\s+')
+
+
+def parse_total_weights(total_label):
+    """
+    Extract addend weights from the formula in a total's label, if any.
+
+    "(18 - 19)" gives {'18': 1, '19': -1}. A "+ -" operator means the
+    addend already carries its own sign, so it keeps weight +1.
+
+    Returns:
+        dict: {child_number: weight}
+    """
+    match = re.search(r'\(([^()]*)\)\s*$', total_label)
+    if not match:
+        return {}
+
+    weights = {}
+    for op, term in FORMULA_TERM_RE.findall(match.group(1)):
+        op = op.replace(' ', '')
+        weights[term] = -1 if op.endswith('-') and '+' not in op else 1
+    return weights
+
+
+def build_rollups(root, xbrl_mappings):
+    """
+    Build the subtotal (roll-up) dependency graph from dimension.xml.
+
+    A <child type="group"> (or a <dimension>) rolls up into:
+    - its single child item whose name starts with "Totale", or
+    - its first child item when that repeats the group name
+      (e.g. "2), 3) variazioni delle rimanenze..." over "2)" and "3)").
+    The numeric children listed before a "Totale" (or after a repeated
+    group name) are the addends; a nested group contributes its own total.
+    "Di cui" breakdowns are never addends, and when the addends include a
+    complementary pair ("Debiti assistiti ..." / "Debiti non assistiti
+    ...") the total is that pair alone. Groups with no total, or with more
+    than one "Totale" child, are left out.
+
+    Weights come from the formula in the total's label when there is one;
+    in a "Totale variazioni" group, decreases (decrementi, ammortamento,
+    svalutazioni, utilizzo) weigh -1.
+
+    Any other item whose label ends in a formula over its siblings'
+    numbers or letters, like "Risultato prima delle imposte (A - B + - C
+    + - D)", rolls up from those siblings.
+
+    Not covered: totals with no formula in their label and no "Totale"
+    or repeated-name item, e.g. "21) Utile (perdita) dell'esercizio".
+
+    Rollups are emitted children-first (topological order), split by the
+    position of the code in a cell key: 'rows' (ROW or ROW_suffix) and
+    'cols' (ROW_COL, second dimension of 2D reports).
+
+    Returns:
+        dict: {report_code: {'rows': [[total, [[addend, weight], ...]], ...],
+                             'cols': [...]}}
+    """
+    print("Building roll-up graph...")
+
+    # 2D and tuple reports type their ROW_COL cells, not the row or column
+    cell_types = {}
+    for code, xbrl in xbrl_mappings.items():
+        if '_' in code:
+            for part in code.split('_'):
+                cell_types.setdefault(part, set()).add(xbrl.get('type'))
+
+    def is_numeric(code):
+        if code in cell_types:
+            return any(t not in NON_NUMERIC_TYPES for t in cell_types[code])
+        xbrl = xbrl_mappings.get(code)
+        return not (xbrl and xbrl.get('type') in NON_NUMERIC_TYPES)
+
+    def visit(group, out):
+        """Emit rollups for group and its descendants, return its total code."""
+        group_name = group.get('name', '')
+        members = []  # (child element, contributed code or None)
+        for child in group.findall('child'):
+            if child.get('type') == 'abstract':
+                continue
+            if child.find('child') is not None:
+                members.append((child, visit(child, out)))
+            elif is_numeric(child.get('code')):
+                members.append((child, child.get('code')))
+
+        # Derived lines like "Differenza ... (A - B)": own roll-up, never an addend
+        numbered = {}
+        for child, code in members:
+            number = CHILD_NUMBER_RE.match(child.get('name', ''))
+            if number and code:
+                numbered[number.group(1)] = code
+        formulas = set()
+        for child, code in members:
+            name = child.get('name', '')
+            weights = parse_total_weights(name)
+            if (child.find('child') is None and weights and not name.lower().startswith('totale')
+                    and all(term in numbered for term in weights)):
+                out.append([code, [[numbered[term], w] for term, w in weights.items()]])
+                formulas.add(code)
+        members = [(child, code) for child, code in members if code not in formulas]
+
+        totals = [c for c, _ in members
+                  if c.find('child') is None and c.get('name', '').lower().startswith('totale')]
+        if len(totals) > 1:
+            return None
+        if totals:
+            total = totals[0]
+        elif members and members[0][0].find('child') is None and members[0][0].get('name') == group_name:
+            total = members[0][0]
+        else:
+            return None
+
+        total_name = total.get('name', '')
+        weights = parse_total_weights(total_name)
+        movements = total_name.lower().startswith('totale variazioni')
+        if totals:
+            members = members[:members.index((total, total.get('code')))]
+
+        members = [(child, code) for child, code in members
+                   if child is not total and code
+                   and not child.get('name', '').lower().startswith(BREAKDOWN_PREFIX)]
+
+        # "X" and "X non ...": the total is the pair, other rows break it down
+        names = {child.get('name', '').lower(): code for child, code in members}
+        for child, code in members:
+            name = child.get('name', '').lower()
+            positive = NEGATION_RE.sub('', name)
+            if positive != name and positive in names:
+                members = [m for m in members if m[1] in (code, names[positive])]
+                break
+
+        addends = []
+        for child, code in members:
+            name = child.get('name', '')
+            number = CHILD_NUMBER_RE.match(name)
+            if number:
+                weight = weights.get(number.group(1), 1)
+            else:
+                words = name.lower().split()
+                weight = -1 if movements and words and words[0] in DECREASE_MOVEMENTS else 1
+            addends.append([code, weight])
+
+        if not addends:
+            return None
+
+        out.append([total.get('code'), addends])
+        return total.get('code')
+
+    rollups = {}
+    total_count = 0
+
+    for report in root.findall('.//report'):
+        report_code = report.get('code')
+        if not report_code:
+            continue
+
+        dimensions = report.findall('dimension')
+        report_rollups = {'rows': [], 'cols': []}
+        for dimension in dimensions:
+            # In 2D reports the axis="1" dimension supplies the column codes
+            is_col = len(dimensions) > 1 and dimension.get('axis') == '1'
+            visit(dimension, report_rollups['cols' if is_col else 'rows'])
+
+        report_rollups = {axis: items for axis, items in report_rollups.items() if items}
+        if report_rollups:
+            rollups[report_code] = report_rollups
+            total_count += sum(len(items) for items in report_rollups.values())
+
+    print(f"  Found {total_count} roll-ups across {len(rollups)} reports")
+    return rollups
 
 
 def merge_mappings(xbrl_mappings, ui_dimensions):
@@ -201,15 +404,30 @@ def merge_mappings(xbrl_mappings, ui_dimensions):
 
     # Convert defaultdict to regular dict and sort entries by code
     result = {}
-    for report_code, entries in sorted(merged.items()):
-        result[report_code] = sorted(entries, key=lambda x: x['code'])
+    with tracing.span('sort'):
+        for report_code, entries in sorted(merged.items()):
+            result[report_code] = sorted(entries, key=lambda x: x['code'])
 
     total_entries = sum(len(entries) for entries in result.values())
+    tracing.count('entries_merged', total_entries)
     print(f"  Merged {total_entries} entries across {len(result)} reports")
 
     return result
 
 
+def write_json(output, output_path, **dump_kwargs):
+    """Serialise output and write it to output_path (traced separately)."""
+    with tracing.span('serialise', file=Path(output_path).name):
+        text = json.dumps(output, ensure_ascii=False, **dump_kwargs)
+
+    with tracing.span('file write', file=Path(output_path).name):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    if tracing.TRACER.enabled:
+        tracing.count('bytes_written', len(text.encode('utf-8')))
+
+
 def generate_json(mappings, output_path):
     """Generate final JSON file with metadata."""
     print(f"Generating {output_path}...")
@@ -227,14 +445,60 @@ def generate_json(mappings, output_path):
         'mappature': mappings
     }
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    write_json(output, output_path, indent=2)
 
     # Calculate size
     size_kb = Path(output_path).stat().st_size / 1024
     print(f"  ✓ Generated {output_path} ({size_kb:.1f} KB)")
 
 
+def generate_rollups_json(rollups, output_path):
+    """Generate rollups.json (compact, machine-only artefact)."""
+    print(f"Generating {output_path}...")
+
+    output = {
+        'metadata': {
+            'generated': datetime.now().isoformat(),
+            'version': '1.0',
+            'source_files': [
+                'data/taxonomy/dimension.xml',
+                'data/taxonomy/mapping.xml'
+            ],
+            'description': 'Subtotal roll-up graph per report, in topological order'
+        },
+        'rollups': rollups
+    }
+
+    write_json(output, output_path, separators=(',', ':'))
+
+    size_kb = Path(output_path).stat().st_size / 1024
+    print(f"  ✓ Generated {output_path} ({size_kb:.1f} KB)")
+
+
+def generate_search_index_json(index, output_path):
+    """Generate search-index.json (compact, loaded without mappings.json)."""
+    print(f"Generating {output_path}...")
+
+    output = {
+        'metadata': {
+            'generated': datetime.now().isoformat(),
+            'version': '1.0',
+            'source_files': [
+                'data/taxonomy/report.xml',
+                'data/taxonomy/dimension.xml',
+                'data/taxonomy/mapping.xml'
+            ],
+            'description': 'Inverted index over report names, row labels and XBRL concepts (accent-folded, sorted terms for prefix search)'
+        }
+    }
+    output.update(index)
+
+    write_json(output, output_path, separators=(',', ':'))
+
+    size_kb = Path(output_path).stat().st_size / 1024
+    print(f"  ✓ Generated {output_path} ({size_kb:.1f} KB)")
+
+
 def validate_output(mappings, sample_table='T0006'):
     """Quick validation of output."""
     print(f"\nValidating output (sample: {sample_table})...")
@@ -265,6 +529,14 @@ def validate_output(mappings, sample_table='T0006'):
 
 def main():
     """Main execution."""
+    parser = argparse.ArgumentParser(description='Generate mappings.json and rollups.json')
+    parser.add_argument('--trace', nargs='?', const='generate_mappings.trace.json', metavar='PATH',
+                        help='write Chrome trace-event JSON (default: %(const)s)')
+    args = parser.parse_args()
+
+    if args.trace:
+        tracing.enable()
+
     print("=" * 80)
     print("XBRL Mappings Generator v2.0")
     print("=" * 80)
@@ -274,7 +546,10 @@ def main():
     base_dir = Path(__file__).parent.parent
     mapping_xml = base_dir / 'data' / 'taxonomy' / 'mapping.xml'
     dimension_xml = base_dir / 'data' / 'taxonomy' / 'dimension.xml'
+    report_xml = base_dir / 'data' / 'taxonomy' / 'report.xml'
     output_json = base_dir / 'data' / 'mapping' / 'mappings.json'
+    rollups_json = base_dir / 'data' / 'mapping' / 'rollups.json'
+    search_json = base_dir / 'data' / 'mapping' / 'search-index.json'
 
     # Verify input files exist
     if not mapping_xml.exists():
@@ -283,16 +558,32 @@ def main():
     if not dimension_xml.exists():
         print(f"✗ Error: {dimension_xml} not found")
         return 1
+    if not report_xml.exists():
+        print(f"✗ Error: {report_xml} not found")
+        return 1
 
     # Parse XML files
     xbrl_mappings = parse_mapping_xml(mapping_xml)
-    ui_dimensions = parse_dimension_xml(dimension_xml)
+    ui_dimensions, dimension_root = parse_dimension_xml(dimension_xml)
+    with tracing.span('parse XML', file=report_xml.name):
+        report_names = parse_report_names(report_xml)
 
     # Merge data
-    merged_mappings = merge_mappings(xbrl_mappings, ui_dimensions)
+    with tracing.span('merge'):
+        merged_mappings = merge_mappings(xbrl_mappings, ui_dimensions)
+
+    # Build roll-up graph
+    with tracing.span('build roll-ups'):
+        rollups = build_rollups(dimension_root, xbrl_mappings)
+
+    # Build search index
+    with tracing.span('build search index'):
+        search_index = build_search_index(merged_mappings, ui_dimensions, report_names)
 
     # Generate JSON
     generate_json(merged_mappings, output_json)
+    generate_rollups_json(rollups, rollups_json)
+    generate_search_index_json(search_index, search_json)
 
     # Validate
     validate_output(merged_mappings)
@@ -302,8 +593,11 @@ def main():
     print("✓ Generation complete!")
     print("=" * 80)
 
+    if args.trace:
+        tracing.write(args.trace)
+
     return 0
 
 
 if __name__ == '__main__':
-    exit(main())
+    sys.exit(main())
@@ -11,9 +11,12 @@ Output: data/template/workbookabb-sparse.json (~0.9 MB sparse)
 
 import json
 import sys
+import argparse
 from pathlib import Path
 from datetime import datetime
 
+import tracing
+
 
 def dense_to_sparse(dense_array):
     """
@@ -71,11 +74,13 @@ def convert_sheets_to_sparse(sheets_dict):
             print(f"  Processing {idx}/{sheet_count} sheets...", end='\r')
 
         # Convert to sparse
-        sparse = dense_to_sparse(sheet_data)
+        with tracing.span('convert sheet', sheet=sheet_name):
+            sparse = dense_to_sparse(sheet_data)
         sparse_sheets[sheet_name] = {
             'meta': sparse['meta'],
             'data': sparse['data']
         }
+        tracing.count('cells_seen', sparse['meta']['rows'] * sparse['meta']['cols'])
 
         # Statistics
         rows = sparse['meta']['rows']
@@ -107,6 +112,14 @@ def convert_sheets_to_sparse(sheets_dict):
 
 def main():
     """Main execution."""
+    parser = argparse.ArgumentParser(description='Convert workbookabb.json to sparse format')
+    parser.add_argument('--trace', nargs='?', const='generate_sparse_template.trace.json', metavar='PATH',
+                        help='write Chrome trace-event JSON (default: %(const)s)')
+    args = parser.parse_args()
+
+    if args.trace:
+        tracing.enable()
+
     print("=" * 80)
     print("SPARSE TEMPLATE GENERATOR")
     print("=" * 80)
@@ -127,8 +140,9 @@ def main():
     print(f"  Size: {input_size:,} bytes ({input_size/1024/1024:.2f} MB)")
     print()
 
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with tracing.span('parse JSON', file=input_path.name):
+        with open(input_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
 
     print(f"Loaded JSON structure:")
     print(f"  Keys: {list(data.keys())}")
@@ -136,7 +150,8 @@ def main():
     print()
 
     # Convert sheets to sparse
-    sparse_sheets = convert_sheets_to_sparse(data.get('sheets', {}))
+    with tracing.span('convert sheets'):
+        sparse_sheets = convert_sheets_to_sparse(data.get('sheets', {}))
 
     # Build output structure
     output_data = {
@@ -156,8 +171,13 @@ def main():
     # Write output
     print()
     print(f"Writing: {output_path}")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=None, separators=(',', ':'))
+    with tracing.span('serialise', file=output_path.name):
+        text = json.dumps(output_data, ensure_ascii=False, indent=None, separators=(',', ':'))
+    with tracing.span('file write', file=output_path.name):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    if tracing.TRACER.enabled:
+        tracing.count('bytes_written', len(text.encode('utf-8')))
 
     output_size = output_path.stat().st_size
     print(f"  Size: {output_size:,} bytes ({output_size/1024/1024:.2f} MB)")
@@ -182,6 +202,9 @@ def main():
     print("  2. Test with sample tables")
     print("  3. Replace workbookabb.json with workbookabb-sparse.json")
 
+    if args.trace:
+        tracing.write(args.trace)
+
     return 0
 
 
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Batch import of filled client workbooks (.xls/.xlsx) into bilancio JSON.
+
+Python counterpart of importFromXLS() in js/sheet-loader.js, producing the
+same bilancio structure ({metadata, fogli}).
+
+This script reads:
+- workbookabb-sparse.json: sheet config rows (tipo_tab, nr_row, first_row,
+  c1_code, ...) and row/column codes
+- one or more filled workbooks
+
+The template is compiled once into an import plan: for every sheet, the
+list of (row, col, cell_code) to read, following importTipo1/2/3. The
+named-range lookups of importConfigurazione are resolved into fixed
+cell coordinates at the same time. Workers receive the plan once and only
+read the listed cells from each workbook.
+
+Reading .xls needs xlrd, reading .xlsx needs openpyxl:
+    pip install xlrd openpyxl
+
+Usage:
+    python3 scripts/import_workbooks.py clienti/*.xls -o bilanci/
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+
+# Named range → cell, as getNamedRangeLocations() in js/sheet-loader.js
+NAMED_RANGES = {
+    # Date INPUT utente (foglio Indice)
+    'c_this_end_input': ('Indice', 2, 2),        # C3
+    'c_this_start_import': ('Indice', 2, 6),     # G3
+    'c_prev_end_import': ('Indice', 3, 8),       # I4
+    'c_prev_start_import': ('Indice', 3, 6),     # G4
+
+    # Date calcolate (foglio Configurazione)
+    'c_this_end': ('Configurazione', 8, 2),      # C9
+    'c_this_start': ('Configurazione', 8, 3),    # D9
+    'c_this': ('Configurazione', 8, 4),          # E9
+    'c_prev_end': ('Configurazione', 9, 2),      # C10
+    'c_prev_start': ('Configurazione', 9, 3),    # D10
+    'c_prev': ('Configurazione', 9, 4),          # E10
+
+    # Altri
+    'cf': ('Configurazione', 13, 2),             # C14 - Codice Fiscale
+    'unit': ('Configurazione', 11, 2)            # C12 - Valuta
+}
+
+# Configuration value → named ranges to try, in priority order
+CONFIG_LOOKUPS = {
+    'fine_corrente': ('c_this_end_input', 'c_this_end'),
+    'inizio_corrente': ('c_this_start_import', 'c_this_start'),
+    'anno_corrente': ('c_this',),
+    'fine_precedente': ('c_prev_end_import', 'c_prev_end'),
+    'inizio_precedente': ('c_prev_start_import', 'c_prev_start'),
+    'anno_precedente': ('c_prev',),
+    'codice_fiscale': ('cf',),
+    'valuta': ('unit',)
+}
+
+EXCEL_EPOCH = date(1899, 12, 30)
+
+
+def _int(value, default=0):
+    """parseInt(value) || default, as in the JS importer."""
+    match = re.match(r'^\s*([+-]?\d+)', str(value)) if value is not None else None
+    return (int(match.group(1)) or default) if match else default
+
+
+def _context_codes(config):
+    c1 = str(config['c1_code']).lstrip('=') if config.get('c1_code') else 'c_this'
+    c2 = str(config['c2_code']).lstrip('=') if config.get('c2_code') else 'c_prev'
+    return [c1, c2]
+
+
+def plan_sheet(sheet_name, data):
+    """
+    Compile one sparse template sheet into its import plan.
+
+    Follows importTipo1 / importTipo2 / importTipo3 in js/sheet-loader.js.
+
+    Args:
+        sheet_name: e.g. 'T0006'
+        data: sparse sheet data {'row': {'col': value}}
+
+    Returns:
+        list: [(xls_row, xls_col, cell_code), ...] or None if the sheet
+        configuration is invalid / unsupported
+    """
+    keys = data.get('0', {})
+    values = data.get('1', {})
+    config = {key: values.get(col) for col, key in keys.items() if key}
+    if not config.get('tipo_tab'):
+        return None
+
+    def cell(row, col):
+        return data.get(str(row), {}).get(str(col))
+
+    tipo_tab = _int(config['tipo_tab'])
+    first_row = _int(config.get('first_row'))
+    first_col = _int(config.get('first_col'))
+    num_rows = _int(config.get('nr_row'))
+    num_cols = _int(config.get('nr_col'))
+    row_code_col = _int(config.get('row_code_nrcol'))
+    col_code_row = _int(config.get('col_code_nrrow'), 2)
+
+    plan = []
+
+    if tipo_tab == 1:
+        if num_rows == 1 and num_cols == 1:
+            # textBlock: il codice è in riga col_code_nrrow
+            code = cell(col_code_row, first_col)
+            if code:
+                plan.append((first_row, first_col, code))
+            return plan
+
+        is_t0000 = sheet_name == 'T0000'
+        column_codes = _context_codes(config) if num_cols == 2 and not is_t0000 else []
+
+        for r in range(num_rows):
+            row_code = cell(first_row + r, row_code_col)
+            if not row_code:
+                continue
+            if column_codes:
+                for c, col_code in enumerate(column_codes):
+                    plan.append((first_row + r, first_col + c, f"{row_code}_{col_code}"))
+            else:
+                for c in range(1 if is_t0000 else num_cols):
+                    plan.append((first_row + r, first_col + c, row_code))
+
+    elif tipo_tab == 2:
+        if num_cols == 2:
+            column_codes = _context_codes(config)
+        else:
+            column_codes = [cell(col_code_row, first_col + c) for c in range(num_cols)]
+
+        for r in range(num_rows):
+            row_code = cell(first_row + r, row_code_col)
+            if not row_code:
+                continue
+            for c, col_code in enumerate(column_codes):
+                if col_code:
+                    plan.append((first_row + r, first_col + c, f"{row_code}_{col_code}"))
+
+    elif tipo_tab == 3:
+        for r in range(num_rows):
+            row_code = cell(first_row + r, row_code_col)
+            if not row_code:
+                continue
+            if num_cols == 1:
+                plan.append((first_row + r, first_col, row_code))
+                continue
+            for c in range(num_cols):
+                col_code = cell(col_code_row, first_col + c)
+                if col_code:
+                    plan.append((first_row + r, first_col + c, f"{row_code}_{col_code}"))
+
+    else:
+        return None
+
+    return plan
+
+
+def build_import_plan(template):
+    """
+    Compile the whole sparse template (once per template).
+
+    Returns:
+        dict: {
+            'sheets': {sheet_name: [(row, col, cell_code), ...]},
+            'named_ranges': {sheet_name: [(row, col, range_name), ...]}
+        }
+    """
+    sheets = {}
+    for sheet_name, sheet in template.get('sheets', {}).items():
+        plan = plan_sheet(sheet_name, sheet.get('data', {}))
+        if plan is not None:
+            sheets[sheet_name] = plan
+
+    named_ranges = {}
+    for range_name, (sheet_name, row, col) in NAMED_RANGES.items():
+        named_ranges.setdefault(sheet_name, []).append((row, col, range_name))
+
+    return {'sheets': sheets, 'named_ranges': named_ranges}
+
+
+def excel_serial_to_iso(serial):
+    """Excel serial date → 'YYYY-MM-DD' (as excelSerialToISO in the JS)."""
+    return (EXCEL_EPOCH + timedelta(days=int(serial))).isoformat()
+
+
+def _normalise(value):
+    """Match SheetJS cell.v: integral floats become ints, dates, times and durations serials."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, datetime):
+        value = value - datetime(1899, 12, 30)
+    elif isinstance(value, time):
+        value = timedelta(hours=value.hour, minutes=value.minute,
+                          seconds=value.second, microseconds=value.microsecond)
+    if isinstance(value, timedelta):
+        serial = value / timedelta(days=1)
+        return int(serial) if serial.is_integer() else serial
+    return value
+
+
+def _read_xls(path, wanted):
+    """Yield (sheet_name, get(row, col)) for the wanted sheets of an .xls file."""
+    try:
+        import xlrd
+    except ImportError:
+        raise RuntimeError('reading .xls files requires xlrd (pip install xlrd)')
+
+    book = xlrd.open_workbook(str(path), on_demand=True)
+    try:
+        for sheet_name in book.sheet_names():
+            if sheet_name not in wanted:
+                continue
+            sheet = book.sheet_by_name(sheet_name)
+
+            def get(row, col, sheet=sheet):
+                if row >= sheet.nrows or col >= sheet.row_len(row):
+                    return None
+                if sheet.cell_type(row, col) == xlrd.XL_CELL_BOOLEAN:
+                    return bool(sheet.cell_value(row, col))
+                return sheet.cell_value(row, col)
+
+            yield sheet_name, get
+            book.unload_sheet(sheet_name)
+    finally:
+        book.release_resources()
+
+
+def _read_xlsx(path, wanted):
+    """Yield (sheet_name, get(row, col)) for the wanted sheets of an .xlsx file."""
+    try:
+        import openpyxl
+    except ImportError:
+        raise RuntimeError('reading .xlsx files requires openpyxl (pip install openpyxl)')
+
+    book = openpyxl.load_workbook(str(path), read_only=True, data_only=True)
+    try:
+        for sheet_name in book.sheetnames:
+            if sheet_name not in wanted:
+                continue
+            max_row = wanted[sheet_name] + 1
+            rows = list(book[sheet_name].iter_rows(max_row=max_row, values_only=True))
+
+            def get(row, col, rows=rows):
+                if row >= len(rows) or col >= len(rows[row]):
+                    return None
+                return rows[row][col]
+
+            yield sheet_name, get
+    finally:
+        book.close()
+
+
+def import_workbook(path, plan):
+    """
+    Import one workbook into a bilancio structure.
+
+    Returns:
+        tuple: (bilancio, imported_cell_count)
+    """
+    now = datetime.now().isoformat()
+    bilancio = {
+        'metadata': {
+            'versione': '1.0',
+            'data_creazione': now,
+            'data_modifica': now,
+            'ragione_sociale': None,
+            'anno_esercizio': datetime.now().year
+        },
+        'fogli': {}
+    }
+
+    # Last row needed per sheet (lets the .xlsx reader stop early)
+    wanted = {name: max((r for r, _, _ in cells), default=0) for name, cells in plan['sheets'].items()}
+    for name, cells in plan['named_ranges'].items():
+        wanted[name] = max(wanted.get(name, 0), max(r for r, _, _ in cells))
+
+    reader = _read_xlsx if Path(path).suffix.lower() in ('.xlsx', '.xlsm') else _read_xls
+
+    ranges = {}
+    count = 0
+    for sheet_name, get in reader(path, wanted):
+        for row, col, range_name in plan['named_ranges'].get(sheet_name, ()):
+            ranges[range_name] = _normalise(get(row, col))
+
+        cells = plan['sheets'].get(sheet_name)
+        if cells is None:
+            continue
+
+        dati = bilancio['fogli'][sheet_name] = {}
+        for row, col, code in cells:
+            value = get(row, col)
+            if value is not None and value != '':
+                dati[code] = _normalise(value)
+                count += 1
+
+    import_configurazione(ranges, bilancio['metadata'])
+    return bilancio, count
+
+
+def import_configurazione(ranges, metadata):
+    """Fill metadata from resolved named ranges (as importConfigurazione)."""
+    found = {}
+    for field, candidates in CONFIG_LOOKUPS.items():
+        found[field] = next((ranges[n] for n in candidates if ranges.get(n)), None)
+
+    for field in ('fine_corrente', 'inizio_corrente', 'fine_precedente', 'inizio_precedente'):
+        value = found[field]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            # Out-of-range serials are skipped (the JS catches and logs them)
+            try:
+                metadata[field] = excel_serial_to_iso(value)
+            except (OverflowError, ValueError):
+                continue
+
+    # Anni da stringhe "c2022" → 2022, altrimenti dalle date di fine
+    years = {}
+    for field, end_field in (('anno_corrente', 'fine_corrente'), ('anno_precedente', 'fine_precedente')):
+        value = found[field]
+        match = re.search(r'(\d{4})', value) if isinstance(value, str) else None
+        if match:
+            years[field] = int(match.group(1))
+        elif metadata.get(end_field):
+            years[field] = int(metadata[end_field][:4])
+
+    if years.get('anno_corrente'):
+        metadata['anno_esercizio'] = years['anno_corrente']
+    if years.get('anno_precedente'):
+        metadata['anno_precedente'] = years['anno_precedente']
+    if found['valuta']:
+        metadata['valuta'] = found['valuta']
+    if found['codice_fiscale']:
+        metadata['codice_fiscale'] = found['codice_fiscale']
+
+
+# Import plan, received once per worker process by _init_worker
+_plan = None
+
+
+def _init_worker(plan):
+    global _plan
+    _plan = plan
+
+
+def _import_file(job):
+    """Worker entry point: import one workbook and write its JSON, never raise."""
+    path, output_path = job
+    try:
+        bilancio, count = import_workbook(path, _plan)
+        # Serialise first: an error must not leave a truncated file behind
+        text = json.dumps(bilancio, ensure_ascii=False, indent=2)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    except Exception as e:
+        return {'file': str(path), 'error': str(e)}
+
+    return {
+        'file': str(path),
+        'output': str(output_path),
+        'sheets': sum(1 for dati in bilancio['fogli'].values() if dati),
+        'cells': count
+    }
+
+
+def output_paths(inputs, output_dir):
+    """
+    Output JSON path of each workbook: its path relative to the directory
+    it was found in (or just its name), with a .json suffix.
+
+    Args:
+        inputs: [(workbook path, directory it was found in or None), ...]
+        output_dir: output directory
+
+    Returns:
+        list: [(workbook path, output path), ...]
+
+    Raises:
+        ValueError: if two workbooks would be written to the same file
+    """
+    jobs = []
+    seen = {}
+    for path, root in inputs:
+        relative = Path(path).relative_to(root) if root else Path(Path(path).name)
+        output_path = Path(output_dir) / relative.with_suffix('.json')
+        # Compare case-insensitively: rossi.json and Rossi.json clash on macOS/Windows
+        key = str(output_path).casefold()
+        if key in seen:
+            raise ValueError(f"{seen[key]} and {path} would both be written to {output_path}")
+        seen[key] = path
+        jobs.append((path, output_path))
+    return jobs
+
+
+def import_workbooks(jobs, plan, workers=None):
+    """
+    Import workbooks in a process pool, one JSON per workbook.
+
+    Args:
+        jobs: [(workbook path, output path), ...] from output_paths()
+
+    Returns:
+        list: one result dict per file, in input order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < 2:
+        _init_worker(plan)
+        return [_import_file(job) for job in jobs]
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(plan,)) as pool:
+        return list(pool.map(_import_file, jobs, chunksize=chunksize))
+
+
+def main():
+    """Main execution."""
+    base_dir = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description='Import filled workbooks into bilancio JSON files')
+    parser.add_argument('workbooks', nargs='+', type=Path, help='.xls/.xlsx files or directories')
+    parser.add_argument('-o', '--output', type=Path, required=True, help='output directory')
+    parser.add_argument('-t', '--template', type=Path,
+                        default=base_dir / 'data' / 'template' / 'workbookabb-sparse.json')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    if not args.template.exists():
+        print(f"✗ Error: {args.template} not found")
+        return 1
+
+    inputs = []
+    for p in args.workbooks:
+        if p.is_dir():
+            inputs.extend(sorted((f, p) for f in p.rglob('*') if f.suffix.lower() in ('.xls', '.xlsx', '.xlsm')))
+        else:
+            inputs.append((p, None))
+
+    try:
+        jobs = output_paths(inputs, args.output)
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        return 1
+
+    with open(args.template, 'r', encoding='utf-8') as f:
+        plan = build_import_plan(json.load(f))
+    print(f"Import plan: {len(plan['sheets'])} sheets, "
+          f"{sum(len(cells) for cells in plan['sheets'].values()):,} cells")
+
+    for output_dir in {output_path.parent for _, output_path in jobs} | {args.output}:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    results = import_workbooks(jobs, plan, args.jobs)
+
+    failed = [r for r in results if 'error' in r]
+    for r in failed:
+        print(f"  ✗ {r['file']}: {r['error']}")
+
+    imported = len(results) - len(failed)
+    cells = sum(r.get('cells', 0) for r in results)
+    print(f"✓ Imported {imported}/{len(results)} workbooks ({cells:,} cells) into {args.output}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Local HTTP lookup service for mappings.json and the sparse template.
+
+This script loads (once, and again whenever the files change):
+- data/mapping/mappings.json
+- data/template/workbookabb-sparse.json
+
+into in-memory indexes and answers lookups over HTTP (stdlib asyncio only):
+
+    GET  /code/<code>          code → concept (XBRL + UI metadata)
+    GET  /concept/<name>       concept (name or prefix:name) → codes
+    GET  /report/<code>        report → sheet (parsed config + sparse data)
+    POST /batch/codes          {"codes": [...]}     → {"results": {...}, "missing": [...]}
+    POST /batch/concepts       {"concepts": [...]}  → idem
+    POST /batch/reports        {"reports": [...]}   → idem
+    GET  /health               artefact versions and index sizes
+
+Every entry is serialised to JSON once at load time, so a batch response
+is built by joining pre-encoded fragments. Responses carry an ETag and
+honour If-None-Match (304).
+
+Usage:
+    python3 scripts/lookup_service.py --port 8765
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+from pathlib import Path
+from urllib.parse import unquote
+
+
+def _encode(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def parse_sheet_config(data):
+    """
+    Parse configuration rows 0-1 of a sparse sheet into a dict.
+
+    Same as parseSheetConfig() in js/sheet-loader.js.
+    """
+    keys = data.get('0', {})
+    values = data.get('1', {})
+    return {key: values.get(col) for col, key in keys.items() if key}
+
+
+def build_index(mappings_path, template_path):
+    """
+    Build the lookup indexes from the generated artefacts.
+
+    Returns:
+        dict: {
+            'codes': {code: bytes},
+            'concepts': {name: bytes},      # both "name" and "prefix:name"
+            'reports': {report_code: bytes},
+            'version': str                  # changes whenever an artefact changes
+        }
+    """
+    with open(mappings_path, 'r', encoding='utf-8') as f:
+        mappings = json.load(f)
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template = json.load(f)
+
+    codes = {}
+    concept_codes = {}
+
+    for report_code, entries in mappings.get('mappature', {}).items():
+        for entry in entries:
+            code = entry['code']
+            concept = {'code': code, 'report': report_code}
+            concept.update(entry.get('ui', {}))
+            xbrl = entry.get('xbrl')
+            if xbrl:
+                concept['xbrl'] = xbrl
+                names = [xbrl['name']]
+                if xbrl.get('prefix'):
+                    names.append(f"{xbrl['prefix']}:{xbrl['name']}")
+                for name in names:
+                    concept_codes.setdefault(name, []).append(code)
+            codes[code] = _encode(concept)
+
+    concepts = {
+        name: _encode({'concept': name, 'codes': sorted(found)})
+        for name, found in concept_codes.items()
+    }
+
+    reports = {}
+    for sheet_name, sheet in template.get('sheets', {}).items():
+        reports[sheet_name] = _encode({
+            'report': sheet_name,
+            'config': parse_sheet_config(sheet.get('data', {})),
+            'sheet': sheet
+        })
+
+    digest = hashlib.blake2b(digest_size=8)
+    for path in (mappings_path, template_path):
+        stat = Path(path).stat()
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+
+    return {
+        'codes': codes,
+        'concepts': concepts,
+        'reports': reports,
+        'version': digest.hexdigest()
+    }
+
+
+def artefact_signature(paths):
+    """(mtime, size) of each artefact, used to detect changes."""
+    signature = []
+    for path in paths:
+        try:
+            stat = Path(path).stat()
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class LookupService:
+    """Holds the current index and serves HTTP requests against it."""
+
+    # URL segment → (index key, batch request field)
+    KINDS = {
+        'code': ('codes', 'codes'),
+        'concept': ('concepts', 'concepts'),
+        'report': ('reports', 'reports'),
+    }
+
+    # /batch/<segment> → kind
+    BATCH_KINDS = {'codes': 'code', 'concepts': 'concept', 'reports': 'report'}
+
+    # Largest request body read (about 30,000 codes per batch)
+    MAX_BODY = 1024 * 1024
+
+    def __init__(self, mappings_path, template_path, reload_interval=2.0):
+        self.paths = (mappings_path, template_path)
+        self.reload_interval = reload_interval
+        self.index = build_index(*self.paths)
+        self.signature = artefact_signature(self.paths)
+
+    async def watch(self):
+        """Poll the artefacts and swap in a fresh index when they change."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            signature = artefact_signature(self.paths)
+            if signature == self.signature or None in signature:
+                continue
+            try:
+                index = await loop.run_in_executor(None, build_index, *self.paths)
+            except Exception as e:
+                # Probably caught mid-write: keep the current index, retry on the next tick
+                print(f"⚠ Reload failed: {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            self.index = index
+            self.signature = signature
+            print(f"✓ Reloaded artefacts (version {index['version']})", file=sys.stderr)
+
+    def lookup(self, kind, key):
+        """Single lookup: (status, body bytes)."""
+        index_key, _ = self.KINDS[kind]
+        body = self.index[index_key].get(key)
+        if body is None:
+            return 404, _encode({'error': f'{kind} not found', kind: key})
+        return 200, body
+
+    def batch(self, kind, payload):
+        """Batch lookup: (status, body bytes)."""
+        index_key, field = self.KINDS[kind]
+        keys = payload.get(field) if isinstance(payload, dict) else payload
+        if not isinstance(keys, list):
+            return 400, _encode({'error': f"expected a JSON list or {{\"{field}\": [...]}}"})
+
+        index = self.index[index_key]
+        parts = []
+        missing = []
+        for key in keys:
+            body = index.get(key) if isinstance(key, str) else None
+            if body is None:
+                missing.append(key)
+            else:
+                parts.append(_encode(key) + b':' + body)
+
+        return 200, (b'{"results":{' + b','.join(parts) + b'},"missing":' + _encode(missing) + b'}')
+
+    def health(self):
+        return 200, _encode({
+            'version': self.index['version'],
+            'codes': len(self.index['codes']),
+            'concepts': len(self.index['concepts']),
+            'reports': len(self.index['reports'])
+        })
+
+    def route(self, method, path, body):
+        """Dispatch one request: (status, body bytes)."""
+        parts = [unquote(p) for p in path.split('?', 1)[0].strip('/').split('/')]
+
+        if method == 'GET' and parts == ['health']:
+            return self.health()
+        if method == 'GET' and len(parts) == 2 and parts[0] in self.KINDS:
+            return self.lookup(parts[0], parts[1])
+        if method == 'POST' and len(parts) == 2 and parts[0] == 'batch':
+            kind = self.BATCH_KINDS.get(parts[1])
+            if kind:
+                try:
+                    payload = json.loads(body or b'null')
+                except ValueError:
+                    return 400, _encode({'error': 'invalid JSON body'})
+                return self.batch(kind, payload)
+
+        return 404, _encode({'error': 'not found'})
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (keep-alive aware)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.respond(writer, 400, _encode({'error': 'bad request'}), {}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length') or 0)
+                if length > self.MAX_BODY:
+                    error = _encode({'error': 'body too large', 'max_bytes': self.MAX_BODY})
+                    await self.respond(writer, 413, error, {}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = self.route(method.upper(), path, body)
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+                await self.respond(writer, status, payload, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except ValueError:
+            # Line over the stream limit or a bad Content-Length
+            try:
+                await self.respond(writer, 400, _encode({'error': 'bad request'}), {}, False)
+            except ConnectionError:
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer, status, payload, request_headers, keep_alive):
+        etag = '"' + hashlib.blake2b(payload, digest_size=16).hexdigest() + '"'
+        if status == 200 and etag in request_headers.get('if-none-match', ''):
+            status, payload = 304, b''
+
+        reason = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+                  413: 'Payload Too Large'}[status]
+        head = [
+            f'HTTP/1.1 {status} {reason}',
+            'Content-Type: application/json; charset=utf-8',
+            f'Content-Length: {len(payload)}',
+            f'ETag: {etag}',
+            'Cache-Control: no-cache',
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+        await writer.drain()
+
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(service.handle, host, port)
+    watcher = asyncio.create_task(service.watch())
+    print(f"✓ Listening on http://{host}:{port} "
+          f"({len(service.index['codes']):,} codes, {len(service.index['reports'])} reports)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+
+def main():
+    """Main execution."""
+    base_dir = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description='Lookup service for mappings.json and the sparse template')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--mappings', type=Path, default=base_dir / 'data' / 'mapping' / 'mappings.json')
+    parser.add_argument('--template', type=Path,
+                        default=base_dir / 'data' / 'template' / 'workbookabb-sparse.json')
+    parser.add_argument('--reload-interval', type=float, default=2.0,
+                        help='seconds between artefact change checks')
+    args = parser.parse_args()
+
+    for path in (args.mappings, args.template):
+        if not path.exists():
+            print(f"✗ Error: {path} not found")
+            return 1
+
+    service = LookupService(args.mappings, args.template, args.reload_interval)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
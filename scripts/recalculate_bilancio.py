@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Recompute subtotals of a bilancio from the precomputed roll-up graph.
+
+This script reads:
+- rollups.json: per-report roll-ups in topological order (from generate_mappings.py)
+- a bilancio JSON file (as saved/exported by the web app)
+
+A full pass recomputes every total of every sheet in one sweep. An
+incremental pass (--cell) only walks the ancestors of the changed cell, so
+its cost grows with the depth of the hierarchy, not the size of the sheet.
+
+A total is written when at least one of its addends has a value. When all
+its addends are empty, a total the engine computed earlier is cleared, while
+a total that was typed in is kept. Computed totals are tracked per sheet in
+bilancio.metadata.totali_calcolati.
+
+Usage:
+    python3 scripts/recalculate_bilancio.py bilancio.json -o ricalcolato.json
+    python3 scripts/recalculate_bilancio.py bilancio.json --cell T0006 T0006.D01.1.001.002.002.000.000_c_this
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+
+def load_rollups(rollups_path):
+    """
+    Load rollups.json and index it for recomputation.
+
+    Returns:
+        dict: {report_code: {
+            'rows': [(total, [(addend, weight), ...]), ...],
+            'cols': [...],
+            'row_parent': {addend: (total, addends)},
+            'col_parent': {addend: (total, addends)},
+            'row_addends': {total: addends},
+            'col_addends': {total: addends}
+        }}
+    """
+    with open(rollups_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    index = {}
+    for report_code, axes in data.get('rollups', {}).items():
+        entry = {}
+        for axis in ('rows', 'cols'):
+            rollups = [(total, [tuple(a) for a in addends]) for total, addends in axes.get(axis, [])]
+            parent = {}
+            for rollup in rollups:
+                for addend, _ in rollup[1]:
+                    parent[addend] = rollup
+            entry[axis] = rollups
+            entry[axis[:-1] + '_parent'] = parent
+            entry[axis[:-1] + '_addends'] = dict(rollups)
+        index[report_code] = entry
+
+    return index
+
+
+def to_number(value):
+    """Numeric value of a cell, or None if empty / not a number."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        number = value
+    elif isinstance(value, str):
+        try:
+            number = float(value.strip())
+        except ValueError:
+            return None
+    else:
+        return None
+    # "nan", "inf" and JSON NaN/Infinity would spread into every ancestor
+    return number if math.isfinite(number) else None
+
+
+def _cell_key(row, suffix):
+    return f"{row}_{suffix}" if suffix else row
+
+
+def _has_values(values, keys):
+    return any(to_number(values.get(key)) is not None for key, _ in keys)
+
+
+def _apply(values, total_key, addend_keys, computed, cross_keys=()):
+    """
+    Write sum(weight * addend) into total_key.
+
+    With no addend values, the total is removed if it is in computed
+    (written by an earlier pass) and kept otherwise (typed in). A cell that
+    is a total on both axes of a 2D sheet (cross_keys: its addends on the
+    other axis) is only removed if those are empty too.
+
+    Returns:
+        bool: True if the stored value changed
+    """
+    total = 0
+    found = False
+    for key, weight in addend_keys:
+        number = to_number(values.get(key))
+        if number is not None:
+            total += weight * number
+            found = True
+
+    if not found:
+        if total_key not in computed or _has_values(values, cross_keys):
+            return False
+        computed.discard(total_key)
+        return values.pop(total_key, None) not in (None, '')
+
+    computed.add(total_key)
+
+    total = round(total, 2)
+    if isinstance(total, float) and total.is_integer():
+        total = int(total)
+
+    if values.get(total_key) == total:
+        return False
+    values[total_key] = total
+    return True
+
+
+def recalculate_sheet(values, report_rollups, computed):
+    """
+    Recompute every total of one sheet in a single topological sweep.
+
+    Row roll-ups run first for every suffix present (c_this, c_prev or a
+    column code), then column roll-ups for every row present.
+
+    Args:
+        values: {cell_key: value} for one sheet (updated in place)
+        report_rollups: one entry of load_rollups()
+        computed: set of total keys written by earlier passes, updated in
+            place (see computed_totals)
+
+    Returns:
+        int: number of totals whose value changed
+    """
+    row_addends = report_rollups['row_addends']
+    col_addends = report_rollups['col_addends']
+    changed = 0
+
+    suffixes = {key.partition('_')[2] for key in values}
+    for total, addends in report_rollups['rows']:
+        for suffix in suffixes:
+            keys = [(_cell_key(a, suffix), w) for a, w in addends]
+            cross = [(_cell_key(total, a), w) for a, w in col_addends.get(suffix, ())]
+            changed += _apply(values, _cell_key(total, suffix), keys, computed, cross)
+
+    if report_rollups['cols']:
+        rows = {key.partition('_')[0] for key in values}
+        for total, addends in report_rollups['cols']:
+            for row in rows:
+                keys = [(_cell_key(row, a), w) for a, w in addends]
+                cross = [(_cell_key(a, total), w) for a, w in row_addends.get(row, ())]
+                changed += _apply(values, _cell_key(row, total), keys, computed, cross)
+
+    return changed
+
+
+def recalculate_cell(values, report_rollups, cell_key, computed):
+    """
+    Recompute only the totals that depend on cell_key.
+
+    Walks the row ancestors of the cell's row code, then, for that row and
+    each row ancestor, the column ancestors of the cell's column code.
+    Cost is O(row depth x column depth). computed is as in
+    recalculate_sheet().
+
+    Returns:
+        list: keys of the totals whose value changed
+    """
+    row, _, suffix = cell_key.partition('_')
+    row_parent = report_rollups['row_parent']
+    col_parent = report_rollups['col_parent']
+    row_addends = report_rollups['row_addends']
+    col_addends = report_rollups['col_addends']
+    changed = []
+
+    rows = [row]
+    rollup = row_parent.get(row)
+    while rollup:
+        total, addends = rollup
+        total_key = _cell_key(total, suffix)
+        keys = [(_cell_key(a, suffix), w) for a, w in addends]
+        cross = [(_cell_key(total, a), w) for a, w in col_addends.get(suffix, ())]
+        if _apply(values, total_key, keys, computed, cross):
+            changed.append(total_key)
+        rows.append(total)
+        rollup = row_parent.get(total)
+
+    for current_row in rows:
+        rollup = col_parent.get(suffix)
+        while rollup:
+            total, addends = rollup
+            total_key = _cell_key(current_row, total)
+            keys = [(_cell_key(current_row, a), w) for a, w in addends]
+            cross = [(_cell_key(a, total), w) for a, w in row_addends.get(current_row, ())]
+            if _apply(values, total_key, keys, computed, cross):
+                changed.append(total_key)
+            rollup = col_parent.get(total)
+
+    return changed
+
+
+def computed_totals(bilancio, sheet):
+    """Keys of the totals of sheet that earlier passes computed (a new set)."""
+    tracked = bilancio.get('metadata', {}).get('totali_calcolati', {})
+    return set(tracked.get(sheet, ()))
+
+
+def store_computed_totals(bilancio, sheet, computed):
+    """Record computed totals in bilancio.metadata.totali_calcolati."""
+    tracked = bilancio.setdefault('metadata', {}).setdefault('totali_calcolati', {})
+    if computed:
+        tracked[sheet] = sorted(computed)
+    else:
+        tracked.pop(sheet, None)
+
+
+def recalculate_bilancio(bilancio, rollups):
+    """
+    Full recomputation of every sheet of a bilancio (in place).
+
+    Totals typed in with no addend values are kept; see
+    bilancio.metadata.totali_calcolati.
+
+    Returns:
+        int: number of totals whose value changed
+    """
+    changed = 0
+    for sheet, values in bilancio.get('fogli', {}).items():
+        report_rollups = rollups.get(sheet)
+        if report_rollups and values:
+            computed = computed_totals(bilancio, sheet)
+            changed += recalculate_sheet(values, report_rollups, computed)
+            store_computed_totals(bilancio, sheet, computed)
+    return changed
+
+
+def main():
+    """Main execution."""
+    base_dir = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description='Recompute bilancio subtotals from rollups.json')
+    parser.add_argument('bilancio', type=Path, help='bilancio JSON file')
+    parser.add_argument('-r', '--rollups', default=base_dir / 'data' / 'mapping' / 'rollups.json',
+                        type=Path, help='path to rollups.json')
+    parser.add_argument('-o', '--output', type=Path, help='output file (default: overwrite input)')
+    parser.add_argument('--cell', nargs=2, metavar=('SHEET', 'CELL'),
+                        help='only recompute the ancestors of this changed cell')
+    args = parser.parse_args()
+
+    if not args.rollups.exists():
+        print(f"✗ Error: {args.rollups} not found (run generate_mappings.py)")
+        return 1
+
+    rollups = load_rollups(args.rollups)
+
+    with open(args.bilancio, 'r', encoding='utf-8') as f:
+        bilancio = json.load(f)
+
+    if args.cell:
+        sheet, cell_key = args.cell
+        report_rollups = rollups.get(sheet)
+        values = bilancio.get('fogli', {}).get(sheet)
+        changed = []
+        if report_rollups and values:
+            computed = computed_totals(bilancio, sheet)
+            changed = recalculate_cell(values, report_rollups, cell_key, computed)
+            store_computed_totals(bilancio, sheet, computed)
+        for key in changed:
+            print(f"  {key} = {values.get(key)}")
+        print(f"✓ Recomputed {len(changed)} totals")
+    else:
+        changed = recalculate_bilancio(bilancio, rollups)
+        print(f"✓ Recomputed {changed} totals")
+
+    output_path = args.output or args.bilancio
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(bilancio, f, ensure_ascii=False, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Full-text search index over report names and row labels.
+
+The index is built by generate_mappings.py (data/mapping/search-index.json)
+from:
+- report.xml: report names (and their XBRL concept)
+- dimension.xml: row labels and fullnames
+- mapping.xml: XBRL concept names (CamelCase split into words)
+
+Tokens are lower-cased and accent-folded ("disponibilità" → "disponibilita"),
+Italian stopwords are dropped (in a query, all but the last word, which
+may be an unfinished prefix, as long as it narrows the results). Terms are stored sorted, so a prefix query
+is a binary search over the term list.
+
+Format:
+    {
+      "docs":     [[code, report_code, label], ...],   # doc id = position
+      "terms":    ["abbreviato", "accantonamenti", ...],
+      "postings": [[doc_id, ...], ...]                # aligned with terms
+    }
+
+Usage:
+    python3 scripts/search_index.py "variazioni rimanenze"
+    python3 scripts/search_index.py "capitale soc" --limit 5
+"""
+
+import argparse
+import json
+import re
+import sys
+import unicodedata
+import xml.etree.ElementTree as ET
+from bisect import bisect_left
+from pathlib import Path
+
+
+STOPWORDS = frozenset((
+    'a', 'ad', 'al', 'alla', 'alle', 'agli', 'ai', 'che', 'con', 'd', 'da', 'dal',
+    'dalla', 'dalle', 'dai', 'dagli', 'dei', 'del', 'della', 'delle', 'dello',
+    'degli', 'di', 'e', 'ed', 'gli', 'i', 'il', 'in', 'l', 'la', 'le', 'lo', 'nei',
+    'nel', 'nella', 'nelle', 'o', 'per', 'su', 'sul', 'sulla', 'sui', 'tra', 'un',
+    'una', 'uno'
+))
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+CAMEL_RE = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+
+def fold(text):
+    """Lower-case and strip accents: 'Attività' → 'attivita'."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    """Split free text into folded index terms (stopwords removed)."""
+    if not text:
+        return []
+    return [t for t in WORD_RE.findall(fold(text)) if t not in STOPWORDS]
+
+
+def tokenize_concept(name):
+    """Split an XBRL concept name: 'CreditiVersoSoci' → ['crediti', 'verso', 'soci']."""
+    if not name:
+        return []
+    return tokenize(' '.join(CAMEL_RE.findall(name))) + [fold(name)]
+
+
+def build_search_index(mappings, ui_dimensions, report_names):
+    """
+    Build the inverted index.
+
+    Args:
+        mappings: merged mappings ({report_code: [entries]})
+        ui_dimensions: dict from parse_dimension_xml (for fullnames)
+        report_names: {report_code: (name, concept_name)} from report.xml
+
+    Returns:
+        dict: {'docs': [...], 'terms': [...], 'postings': [...]}
+    """
+    print("Building search index...")
+
+    docs = []
+    term_docs = {}
+
+    def add(code, report_code, label, texts, concept):
+        doc_id = len(docs)
+        docs.append([code, report_code, label])
+        terms = set(tokenize_concept(concept))
+        for text in texts:
+            terms.update(tokenize(text))
+        for term in terms:
+            term_docs.setdefault(term, []).append(doc_id)
+
+    for report_code in sorted(mappings):
+        name, concept = report_names.get(report_code, ('', None))
+        add(report_code, report_code, name, [name], concept)
+
+        for entry in mappings[report_code]:
+            label = entry['ui'].get('label', '')
+            if not label or label == 'Heading':
+                continue
+            ui = ui_dimensions.get(entry['code'], {})
+            concept = entry.get('xbrl', {}).get('name')
+            add(entry['code'], report_code, label, [label, ui.get('fullname', '')], concept)
+
+    terms = sorted(term_docs)
+    postings = [term_docs[term] for term in terms]
+
+    print(f"  Indexed {len(docs)} documents, {len(terms)} terms")
+    return {'docs': docs, 'terms': terms, 'postings': postings}
+
+
+def parse_report_names(xml_path):
+    """
+    Parse report.xml for table names.
+
+    Returns:
+        dict: {report_code: (name, xbrl concept name)}
+    """
+    print(f"Parsing {xml_path}...")
+    root = ET.parse(xml_path).getroot()
+
+    names = {}
+    for report in root.iter('report'):
+        if report.get('type') == 'table' and report.get('code'):
+            names[report.get('code')] = (report.get('name', ''), report.get('{http://www.xbrl.org}name'))
+
+    print(f"  Found {len(names)} report names")
+    return names
+
+
+def _prefix_docs(index, prefix):
+    """Union of postings for every term starting with prefix."""
+    terms = index['terms']
+    found = set()
+    i = bisect_left(terms, prefix)
+    while i < len(terms) and terms[i].startswith(prefix):
+        found.update(index['postings'][i])
+        i += 1
+    return found
+
+
+def _match_all(index, words):
+    """Documents matching every word as a prefix (None if there are no words)."""
+    matches = None
+    for word in sorted(set(words), key=len, reverse=True):
+        docs = _prefix_docs(index, word)
+        matches = docs if matches is None else matches & docs
+        if not matches:
+            return set()
+    return matches
+
+
+def search(index, query, limit=20):
+    """
+    Find documents matching every query word (each word as a prefix).
+
+    Stopwords are skipped, except the last word: it may be the start of a
+    longer word still being typed ("con" → "controllate"). A trailing
+    stopword is only kept when it narrows the results; stopwords are not
+    indexed, so "riserva per" falls back to "riserva".
+
+    Reports rank before rows, then shorter labels first.
+
+    Returns:
+        list: [[code, report_code, label], ...]
+    """
+    words = WORD_RE.findall(fold(query))
+    last = words[-1:]
+    words = [w for w in words if w not in STOPWORDS]
+    if not last:
+        return []
+
+    matches = _match_all(index, words)
+    if last[0] in STOPWORDS and (matches is None or matches):
+        narrowed = _match_all(index, words + last)
+        if narrowed:
+            matches = narrowed
+    if not matches:
+        return []
+
+    docs = index['docs']
+    ranked = sorted(matches, key=lambda d: (docs[d][0] != docs[d][1], len(docs[d][2]), d))
+    return [docs[d] for d in ranked[:limit]]
+
+
+def main():
+    """Main execution."""
+    base_dir = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description='Search report names and row labels')
+    parser.add_argument('query', help='words to search (prefixes allowed)')
+    parser.add_argument('--index', type=Path, default=base_dir / 'data' / 'mapping' / 'search-index.json')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    if not args.index.exists():
+        print(f"✗ Error: {args.index} not found (run generate_mappings.py)")
+        return 1
+
+    with open(args.index, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+
+    for code, report_code, label in search(index, args.query, args.limit):
+        print(f"{code:<40} {label}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Opt-in tracing for the generator scripts (Chrome trace-event format).
+
+Usage from a script:
+    import tracing
+
+    tracing.enable()                          # only when --trace is given
+    with tracing.span('parse', file='x.xml'):
+        ...
+        tracing.count('cells_seen', 42)
+    tracing.write('generate_mappings.trace.json')
+
+When tracing is not enabled, span() and count() are cheap no-ops.
+The output opens in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class Tracer:
+    """Collects complete ('X') spans and counter ('C') events."""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.counters = {}
+        self._start = time.perf_counter()
+        self._pid = os.getpid()
+
+    def _now_us(self):
+        return (time.perf_counter() - self._start) * 1e6
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self.counters = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, **args):
+        if not self.enabled:
+            yield
+            return
+
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            end = self._now_us()
+            self.events.append({
+                'name': name,
+                'ph': 'X',
+                'ts': start,
+                'dur': end - start,
+                'pid': self._pid,
+                'tid': threading.get_ident(),
+                'args': args
+            })
+            peak = peak_memory_kb()
+            if peak is not None:
+                self._counter_event('peak_memory_kb', peak, end)
+
+    def count(self, name, value=1):
+        """Add value to a running counter and record its new total."""
+        if not self.enabled:
+            return
+        self.counters[name] = self.counters.get(name, 0) + value
+        self._counter_event(name, self.counters[name], self._now_us())
+
+    def _counter_event(self, name, value, ts):
+        self.events.append({
+            'name': name,
+            'ph': 'C',
+            'ts': ts,
+            'pid': self._pid,
+            'args': {name: value}
+        })
+
+    def write(self, output_path):
+        """Write the trace file and print a short per-span summary."""
+        if not self.enabled:
+            return
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+
+        totals = {}
+        for event in self.events:
+            if event['ph'] == 'X':
+                count, dur = totals.get(event['name'], (0, 0))
+                totals[event['name']] = (count + 1, dur + event['dur'])
+
+        print(f"\nTrace written to {output_path}")
+        for name, (count, dur) in sorted(totals.items(), key=lambda x: -x[1][1]):
+            suffix = f" ({count}×)" if count > 1 else ""
+            print(f"  {dur / 1000:>10.1f} ms  {name}{suffix}")
+        for name, value in sorted(self.counters.items()):
+            print(f"  {name}: {value:,}")
+        peak = peak_memory_kb()
+        if peak is not None:
+            print(f"  peak_memory_kb: {peak:,}")
+
+
+def peak_memory_kb():
+    """Peak resident set size of this process in KB (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak // 1024 if os.uname().sysname == 'Darwin' else peak
+
+
+# Default tracer shared by the generator scripts
+TRACER = Tracer()
+
+enable = TRACER.enable
+span = TRACER.span
+count = TRACER.count
+write = TRACER.write
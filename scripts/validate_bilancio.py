@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Batch-validate bilancio JSON files against the XBRL mappings.
+
+This script reads:
+- mappings.json: XBRL metadata (type, period_type) for each code
+- one or more bilancio JSON files (as saved/exported by the web app)
+
+mappings.json is compiled once into a {code: validator} table, so each
+cell costs a dict lookup plus one small function call. Files are validated
+in a process pool and a structured JSON error report is written.
+
+Usage:
+    python3 scripts/validate_bilancio.py bilanci/ other.json -o report.json
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+
+# Plain decimal numbers: "1234", "-1234.56", "+0.5", "1e3"
+NUMBER_RE = re.compile(r'^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$')
+
+# Context suffixes the web app uses for temporal (2-column) sheets
+DEFAULT_CONTEXTS = ('c_this', 'c_prev')
+
+
+def is_empty(value):
+    """Same notion of 'empty' as the web app (null, undefined, '')."""
+    return value is None or value == ''
+
+
+def _check_numeric(value):
+    if isinstance(value, bool):
+        return 'Boolean value for a numeric concept'
+    if isinstance(value, (int, float)):
+        return None if math.isfinite(value) else 'Non-finite numeric value'
+    if isinstance(value, str) and NUMBER_RE.match(value.strip()):
+        # "1e999" matches the pattern but overflows to inf
+        return None if math.isfinite(float(value)) else 'Non-finite numeric value'
+    return 'Invalid numeric value'
+
+
+def _check_text(value):
+    if isinstance(value, bool):
+        return 'Boolean value for a text concept'
+    if isinstance(value, (str, int, float)):
+        return None
+    return 'Invalid text value'
+
+
+def _check_text_block(value):
+    if isinstance(value, str):
+        return None
+    return 'Text block must be a string'
+
+
+def _check_date(value):
+    # Excel serial numbers are accepted, as importFromXLS may store them
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return None
+    if isinstance(value, str):
+        try:
+            date.fromisoformat(value.strip())
+            return None
+        except ValueError:
+            pass
+    return 'Invalid date (expected YYYY-MM-DD)'
+
+
+def _check_boolean(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false', 'si', 'sì', 'no'):
+        return None
+    return 'Invalid boolean value'
+
+
+def _check_must_be_empty(value):
+    return 'Abstract concept must be empty'
+
+
+def _check_no_period(value):
+    return 'Concept has no period type and cannot carry a value'
+
+
+def _check_unknown_type(value):
+    return None
+
+
+VALUE_CHECKS = {
+    'monetary': _check_numeric,
+    'decimal': _check_numeric,
+    'shares': _check_numeric,
+    'num:percent': _check_numeric,
+    'string': _check_text,
+    'nonnum:textBlock': _check_text_block,
+    'date': _check_date,
+    'boolean': _check_boolean,
+    'abstract': _check_must_be_empty,
+    'tuple': _check_must_be_empty,
+}
+
+
+def make_validator(xbrl_type, period_type):
+    """
+    Build the validator for one (xbrl type, period type) pair.
+
+    Returns:
+        callable: value -> error message or None
+    """
+    check = VALUE_CHECKS.get(xbrl_type, _check_unknown_type)
+    if check is not _check_must_be_empty and period_type is None:
+        check = _check_no_period
+
+    def validator(value):
+        if is_empty(value):
+            return None
+        return check(value)
+
+    return validator
+
+
+def compile_mappings(mappings):
+    """
+    Compile mappings.json into per-code validators.
+
+    Validators are shared between codes with the same (type, period_type),
+    so compiling ~7,500 codes only creates a handful of functions.
+
+    Args:
+        mappings: parsed mappings.json
+
+    Returns:
+        dict: {
+            'validators': {code: (validator, xbrl_type, period_type)},
+            'codes': {report_code: set of its codes (with or without XBRL data)},
+            'columns': {report_code: set of column codes}
+        }
+    """
+    factory_cache = {}
+    validators = {}
+    codes = {}
+    columns = {}
+
+    for report_code, entries in mappings.get('mappature', {}).items():
+        report_codes = codes.setdefault(report_code, set())
+        report_columns = columns.setdefault(report_code, set())
+        for entry in entries:
+            code = entry['code']
+            report_codes.add(code)
+
+            # 2D cells are "ROW_COL": remember COL as a valid suffix
+            if '_' in code:
+                report_columns.add(code.split('_', 1)[1])
+
+            xbrl = entry.get('xbrl')
+            if not xbrl:
+                continue
+
+            key = (xbrl.get('type'), xbrl.get('period_type'))
+            if key not in factory_cache:
+                factory_cache[key] = make_validator(*key)
+            validators[code] = (factory_cache[key], key[0], key[1])
+
+    return {'validators': validators, 'codes': codes, 'columns': columns}
+
+
+def validate_bilancio(bilancio, compiled):
+    """
+    Validate one bilancio structure.
+
+    Args:
+        bilancio: dict with 'fogli': {sheet: {cell_code: value}}
+        compiled: result of compile_mappings
+
+    Returns:
+        tuple: (checked_cell_count, [error dicts])
+    """
+    validators = compiled['validators']
+    codes = compiled['codes']
+    columns = compiled['columns']
+
+    errors = []
+    checked = 0
+
+    fogli = bilancio.get('fogli')
+    if not isinstance(fogli, dict):
+        return 0, [{'message': "Missing 'fogli' object"}]
+
+    for sheet, cells in fogli.items():
+        if not isinstance(cells, dict):
+            errors.append({'sheet': sheet, 'message': 'Sheet data must be an object'})
+            continue
+
+        # Codes resolve within the sheet's own report, as findMappingByCode
+        sheet_codes = codes.get(sheet, ())
+        sheet_columns = columns.get(sheet, ())
+
+        for cell_code, value in cells.items():
+            checked += 1
+
+            # Exact match first (2D cells), then row code + context suffix
+            code = cell_code
+            if code not in sheet_codes:
+                code, _, suffix = cell_code.partition('_')
+                if code not in sheet_codes:
+                    if not is_empty(value):
+                        errors.append({'sheet': sheet, 'cell': cell_code, 'value': value,
+                                       'message': 'Unknown code'})
+                    continue
+                if suffix and suffix not in DEFAULT_CONTEXTS and suffix not in sheet_columns:
+                    errors.append({'sheet': sheet, 'cell': cell_code, 'value': value,
+                                   'message': f"Unknown context '{suffix}'"})
+                    continue
+
+            compiled_entry = validators.get(code)
+            if compiled_entry is None:
+                continue
+
+            validator, xbrl_type, period_type = compiled_entry
+            message = validator(value)
+            if message:
+                errors.append({
+                    'sheet': sheet,
+                    'cell': cell_code,
+                    'code': code,
+                    'type': xbrl_type,
+                    'period_type': period_type,
+                    'value': value,
+                    'message': message
+                })
+
+    return checked, errors
+
+
+# Compiled mappings, built once per worker process by _init_worker
+_compiled = None
+
+
+def _init_worker(mappings_path):
+    global _compiled
+    with open(mappings_path, 'r', encoding='utf-8') as f:
+        _compiled = compile_mappings(json.load(f))
+
+
+def _validate_file(path):
+    """Worker entry point: validate one file, never raise."""
+    result = {'file': str(path), 'cells': 0, 'errors': []}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            bilancio = json.load(f)
+    except (OSError, ValueError) as e:
+        result['errors'].append({'message': f'Cannot read file: {e}'})
+    else:
+        if isinstance(bilancio, dict):
+            result['cells'], result['errors'] = validate_bilancio(bilancio, _compiled)
+        else:
+            result['errors'].append({'message': 'File is not a bilancio object'})
+
+    result['valid'] = not result['errors']
+    return result
+
+
+def collect_files(paths):
+    """Expand directories into the *.json files they contain (recursively)."""
+    files = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files.extend(sorted(p.rglob('*.json')))
+        else:
+            files.append(p)
+    return files
+
+
+def validate_files(files, mappings_path, workers=None):
+    """
+    Validate files in a process pool.
+
+    Returns:
+        list: one result dict per file, in input order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < 2:
+        _init_worker(mappings_path)
+        return [_validate_file(f) for f in files]
+
+    chunksize = max(1, len(files) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(mappings_path),)) as pool:
+        return list(pool.map(_validate_file, files, chunksize=chunksize))
+
+
+def main():
+    """Main execution."""
+    base_dir = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description='Validate bilancio JSON files against mappings.json')
+    parser.add_argument('paths', nargs='+', help='bilancio JSON files or directories')
+    parser.add_argument('-m', '--mappings', default=base_dir / 'data' / 'mapping' / 'mappings.json',
+                        type=Path, help='path to mappings.json')
+    parser.add_argument('-o', '--output', type=Path, help='write JSON report here (default: stdout)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    if not args.mappings.exists():
+        print(f"✗ Error: {args.mappings} not found", file=sys.stderr)
+        return 1
+
+    files = collect_files(args.paths)
+    results = validate_files(files, args.mappings, args.jobs)
+
+    invalid = sum(1 for r in results if not r['valid'])
+    report = {
+        'summary': {
+            'files': len(results),
+            'valid': len(results) - invalid,
+            'invalid': invalid,
+            'cells': sum(r['cells'] for r in results),
+            'errors': sum(len(r['errors']) for r in results)
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+    summary = report['summary']
+    print(f"✓ Validated {summary['files']} files ({summary['cells']:,} cells): "
+          f"{summary['invalid']} invalid, {summary['errors']} errors", file=sys.stderr)
+
+    return 1 if invalid else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
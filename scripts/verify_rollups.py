@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Quick verification of known totals in rollups.json
+
+Recomputes a few hand-checked sheets with recalculate_bilancio.py:
+- T0006: formula weights ("15 + 16 - 17 + - 17-bis", "A - B + - C + - D")
+- T0043: "Totale variazioni" subtracts decrements, depreciation, write-downs
+- T0368: "Totale" does not add "Debiti di durata residua superiore a cinque anni"
+- T0077: the string field "Area geografica" is not an addend
+- clearing an addend clears the totals computed from it
+
+then recomputes the filed instances shipped with the XBRL generator
+(XBRL_NI_GENERATOR_20181104/.../tmp/xml) and compares with the filed totals.
+"""
+
+import json
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from recalculate_bilancio import (load_rollups, recalculate_bilancio, recalculate_cell,
+                                  recalculate_sheet, to_number)
+
+
+# sheet → (input cells, {total cell: expected value})
+CASES = {
+    'T0006': (
+        {
+            'T0006.D01.1.001.005.002.007.000_c_this': 100,   # 15) proventi da partecipazioni
+            'T0006.D01.1.001.005.003.005.000_c_this': 50,    # 16) altri proventi finanziari
+            'T0006.D01.1.001.005.004.007.000_c_this': 30,    # 17) interessi e altri oneri
+            'T0006.D01.1.001.005.005.000.000_c_this': -5,    # 17-bis) utili e perdite su cambi
+        },
+        {
+            'T0006.D01.1.001.005.006.000.000_c_this': 115,   # Totale C) (15 + 16 - 17 + - 17-bis)
+            'T0006.D01.1.001.007.000.000.000_c_this': 115,   # Risultato prima delle imposte
+        }
+    ),
+    'T0005': (
+        {
+            'T0005.D01.1.001.002.007.000.000_c_this': 1000,  # Totale valore della produzione
+            'T0005.D01.1.001.003.011.000.000_c_this': 800,   # Totale costi della produzione
+            'T0005.D01.1.001.005.006.000.000_c_this': -30,   # Totale proventi e oneri finanziari
+        },
+        {
+            'T0005.D01.1.001.004.000.000.000_c_this': 200,   # Differenza (A - B)
+            'T0005.D01.1.001.007.000.000.000_c_this': 170,   # Risultato (A - B + - C + - D)
+        }
+    ),
+    'T0043': (
+        {
+            'T0043.D01.1.003.002_T0043.D02.1.001': 50,       # Incrementi per acquisizioni
+            'T0043.D01.1.003.004_T0043.D02.1.001': 100,      # Decrementi per alienazioni
+            'T0043.D01.1.003.006_T0043.D02.1.001': 20,       # Ammortamento dell'esercizio
+            'T0043.D01.1.003.009_T0043.D02.1.001': -70,      # Totale variazioni (as typed)
+        },
+        {
+            'T0043.D01.1.003.009_T0043.D02.1.001': -70,
+            'T0043.D01.1.003.009_T0043.D02.1.008': -70,      # Totale immobilizzazioni immateriali
+        }
+    ),
+    'T0368': (
+        {
+            'T0368.D01.1.002.000_T0368.D02.1.001': 500,      # di durata residua > 5 anni
+            'T0368.D01.1.003.002_T0368.D02.1.001': 300,      # assistiti da ipoteche
+            'T0368.D01.1.004.000_T0368.D02.1.001': 200,      # non assistiti
+        },
+        {
+            'T0368.D01.1.003.005_T0368.D02.1.001': 300,      # Totale debiti assistiti
+            'T0368.D01.1.005.000_T0368.D02.1.001': 500,      # Totale
+        }
+    ),
+    'T0077': (
+        {
+            'T0077.D01.1.001.001_T0077.D02.1.001.001': '39',  # Area geografica
+            'T0077.D01.1.001.002_T0077.D02.1.001.001': 100,   # verso controllate
+            'T0077.D01.1.001.003_T0077.D02.1.001.001': 20,    # verso collegate
+        },
+        {'T0077.D01.1.001.007_T0077.D02.1.001.001': 120}      # Totale crediti immobilizzati
+    ),
+}
+
+# Codes that must never be summed into a total
+NON_ADDENDS = {
+    'T0368': ['T0368.D01.1.002.000'],
+    'T0077': ['T0077.D01.1.001.001'],
+    'T0116': ['T0116.D01.1.001.001'],
+    'T0503': ['T0503.D01.1.002.002', 'T0503.D01.1.003.002'],
+}
+
+INSTANCES_DIR = Path('XBRL_NI_GENERATOR_20181104') / 'XBRL_NI_GENERATOR' / '2018-11-04' / 'tmp' / 'xml'
+
+# Filed amounts are rounded to the euro line by line
+ROUNDING_TOLERANCE = 5
+
+# Filed totals that disagree with their own filed addends
+KNOWN_FILING_ERRORS = {
+    # Totale patrimonio netto of "Decrementi" is -1, its addends sum to -1987
+    ('2023.xml', 'T0335.D01.1.004.003_T0335.D02.1.012.000'),
+}
+
+
+def load_instance(path):
+    """
+    Filed facts of an instance, grouped like bilancio sheets.
+
+    Returns:
+        dict: {(report_code, context): {cell_key: number}}
+    """
+    sheets = {}
+    for fact in ET.parse(path).getroot().iter('fact'):
+        report, cell, context = fact.get('report_code'), fact.get('cell_code'), fact.get('context_code')
+        number = to_number(fact.text)
+        if number is None:
+            continue
+        if '_' in cell:
+            # 2D cell: one sheet per context
+            sheets.setdefault((report, context), {})[cell] = number
+        else:
+            sheets.setdefault((report, None), {})[f"{cell}_{context}"] = number
+    return sheets
+
+
+def main():
+    base_dir = Path(__file__).parent.parent
+    rollups_json = base_dir / 'data' / 'mapping' / 'rollups.json'
+
+    print("=" * 80)
+    print("ROLL-UP VERIFICATION")
+    print("=" * 80)
+    print()
+
+    rollups = load_rollups(rollups_json)
+    with open(rollups_json, 'r', encoding='utf-8') as f:
+        raw = json.load(f)['rollups']
+
+    failures = 0
+
+    print("KNOWN TOTALS:")
+    print("-" * 80)
+
+    for sheet, (cells, expected) in CASES.items():
+        bilancio = {'fogli': {sheet: dict(cells)}}
+        recalculate_bilancio(bilancio, rollups)
+        values = bilancio['fogli'][sheet]
+
+        for key, value in expected.items():
+            ok = values.get(key) == value
+            failures += not ok
+            status = "✓" if ok else "✗"
+            print(f"  {status} {key}: {values.get(key)} (expected {value})")
+
+    print()
+    print("CLEARED ADDEND:")
+    print("-" * 80)
+
+    addend = 'T0006.D01.1.001.005.002.002.000_c_this'     # da imprese controllate
+    values = {addend: 100}
+    computed = set()
+    recalculate_sheet(values, rollups['T0006'], computed)
+    values[addend] = None
+    changed = recalculate_cell(values, rollups['T0006'], addend, computed)
+    ok = bool(changed) and all(values.get(key) is None for key in changed)
+    failures += not ok
+    print(f"  {'✓' if ok else '✗'} {len(changed)} computed totals cleared, "
+          f"{len(computed)} still tracked")
+
+    print()
+    print("NON-ADDENDS:")
+    print("-" * 80)
+
+    for sheet, codes in NON_ADDENDS.items():
+        addends = {
+            code
+            for axis in raw.get(sheet, {}).values()
+            for _, items in axis
+            for code, _ in items
+        }
+        for code in codes:
+            ok = code not in addends
+            failures += not ok
+            status = "✓" if ok else "✗"
+            print(f"  {status} {code} is {'not ' if ok else ''}an addend")
+
+    instances_dir = base_dir / INSTANCES_DIR
+    print()
+    print("FILED INSTANCES:")
+    print("-" * 80)
+
+    for path in sorted(instances_dir.glob('*.xml')):
+        checked = 0
+        mismatches = []
+        for (report, _), filed in load_instance(path).items():
+            if report not in rollups:
+                continue
+            values = dict(filed)
+            recalculate_sheet(values, rollups[report], set())
+            for key, number in filed.items():
+                checked += 1
+                if abs(to_number(values.get(key)) - number) > ROUNDING_TOLERANCE:
+                    if (path.name, key) not in KNOWN_FILING_ERRORS:
+                        mismatches.append((key, number, values.get(key)))
+
+        failures += len(mismatches)
+        status = "✓" if not mismatches else "✗"
+        print(f"  {status} {path.name}: {checked} filed cells, {len(mismatches)} totals differ")
+        for key, number, computed_value in mismatches:
+            print(f"      {key}: filed {number}, computed {computed_value}")
+
+    print()
+    print("=" * 80)
+    if failures:
+        print(f"✗ {failures} check(s) failed")
+    else:
+        print("✓ Verification complete!")
+    print("=" * 80)
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Quick verification of query handling in search_index.py
+
+Runs a few queries against search-index.json:
+- a trailing stopword that starts longer words narrows the results
+  ("crediti con" → "controllate", "controllanti")
+- a trailing stopword that matches nothing is dropped
+  ("riserva per" → same results as "riserva")
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from search_index import search
+
+
+# query → (query without its trailing stopword, whether the stopword narrows it)
+CASES = {
+    'crediti con': ('crediti', True),
+    'riserva per': ('riserva', False),
+}
+
+
+def main():
+    base_dir = Path(__file__).parent.parent
+    index_json = base_dir / 'data' / 'mapping' / 'search-index.json'
+
+    print("=" * 80)
+    print("SEARCH VERIFICATION")
+    print("=" * 80)
+    print()
+
+    with open(index_json, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+
+    failures = 0
+
+    print("TRAILING STOPWORDS:")
+    print("-" * 80)
+
+    for query, (shorter, narrows) in CASES.items():
+        results = search(index, query, limit=None)
+        broader = search(index, shorter, limit=None)
+        if narrows:
+            ok = bool(results) and len(results) < len(broader)
+        else:
+            ok = bool(results) and results == broader
+        failures += not ok
+        status = "✓" if ok else "✗"
+        print(f"  {status} {query!r}: {len(results)} results ({shorter!r}: {len(broader)})")
+
+    print()
+    print("=" * 80)
+    if failures:
+        print(f"✗ {failures} check(s) failed")
+    else:
+        print("✓ Verification complete!")
+    print("=" * 80)
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())